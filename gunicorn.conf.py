@@ -0,0 +1,10 @@
+# Gunicorn settings for the trunk metrics dashboard: gunicorn trunk_metrics:server
+bind = "0.0.0.0:8050"
+workers = 1  # Counters live in process memory, so a single worker keeps them authoritative
+threads = 16  # At most STREAM_LIMIT (8) are held by /stream connections; the rest serve callbacks
+worker_class = "gthread"
+
+def post_worker_init(worker):
+    # Start the notification stream inside the worker process, after the fork
+    import trunk_metrics
+    trunk_metrics.start_websocket_thread()
@@ -1,16 +1,23 @@
 import os
 import random
-import string
+import secrets
 from dotenv import load_dotenv
 import PureCloudPlatformClientV2
 from PureCloudPlatformClientV2.apis import NotificationsApi, TelephonyProvidersEdgeApi
-import websocket
-import json
+import asyncio
+import websockets
+from websockets.asyncio.client import connect as websocket_connect
+import orjson
 import threading
 import time
 import logging
+from array import array
 from collections import defaultdict
-from dash import Dash, html, dcc, Input, Output
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from dash import Dash, html, dcc, Input, Output, State, ALL
+from dash.exceptions import PreventUpdate
+from flask import Response
 from trunkID import trunk_ids  # Import trunk IDs
 
 # Set up logging
@@ -29,162 +36,319 @@ CLIENT_ID = os.getenv("PROD2_CLIENT_ID")
 CLIENT_SECRET = os.getenv("PROD2_CLIENT_SECRET")
 REGION = PureCloudPlatformClientV2.PureCloudRegionHosts.us_east_2
 ENVIRONMENT = REGION.get_api_host()
+FETCH_WORKERS = 16  # Concurrent trunk lookups in fetch_trunk_names
+TRUNK_MAP_CACHE = "trunk_map.json"  # On-disk copy of trunk_id_to_base_map
+TRUNK_MAP_MAX_AGE = 24 * 60 * 60  # Seconds before the cached trunk map is refetched
+PING_INTERVAL = 30  # Seconds between RFC 6455 ping frames on the notification socket
+PING_TIMEOUT = 10  # Seconds to wait for a pong before treating the connection as dead
+STREAM_COALESCE = 0.2  # Seconds to gather a burst of changes into one /stream event
+STREAM_LIMIT = 8  # Concurrent /stream connections; keep below the server's thread count
+STREAM_RETRY_AFTER = 30  # Seconds a refused /stream client waits before trying again
+STREAM_KEEPALIVE = 15  # Seconds of silence before /stream sends a comment to detect dropped clients
+RECONNECT_MAX_DELAY = 60  # Upper bound in seconds on the reconnect backoff, before jitter
+RECONNECT_MAX_ATTEMPT = 20  # Cap on the backoff exponent (1.5 ** 20 is already far above RECONNECT_MAX_DELAY)
+TRUNK_LOG_INTERVAL = 60  # Seconds between per-trunk update log lines
 
 # Store call counts per trunkbase name and per trunk ID, plus mapping of trunk ID to trunkbase name
-call_counts = defaultdict(lambda: {"inbound": 0, "outbound": 0})  # Pre-populated totals (not updated directly)
-trunk_counts = defaultdict(lambda: {"inbound": 0, "outbound": 0})  # Latest counts per trunk_id
+call_counts = {}  # Running totals per trunkbase name; only apply_trunk_map adds or removes keys
+trunk_index = {trunk_id: i for i, trunk_id in enumerate(trunk_ids)}  # Position of each trunk_id in the count arrays
+inbound_counts = array("q", [0]) * len(trunk_ids)  # Latest inbound count per trunk, indexed by trunk_index
+outbound_counts = array("q", [0]) * len(trunk_ids)  # Latest outbound count per trunk, indexed by trunk_index
 trunk_id_to_base_map = {}  # Map trunk IDs to trunkbase names
+api_client = None  # Shared PureCloud API client, created on first authentication
+base_to_trunk_ids = defaultdict(list)  # Reverse map of trunkbase names to trunk IDs
+layout_version = 0  # Bumped whenever the set of trunkbase names is (re)loaded
+trunk_fetch_lock = threading.Lock()  # Held while trunkbase names are being fetched from the API
+trunk_map_refreshed = False  # Whether this process has fetched a complete trunk map from the API
+counts_lock = threading.Lock()  # Guards the counters while the trunk map is being reapplied
+counts_changed = threading.Condition(counts_lock)  # Notified whenever counts_sequence moves on
+counts_sequence = 0  # Bumped on every change the dashboard should see
+stream_slots = threading.BoundedSemaphore(STREAM_LIMIT)  # Free /stream connection slots
+trunk_last_logged = {}  # Monotonic time of the last update log line per trunk_id
 
-# Generate random correlation ID
-def generate_correlation_id(length=12):
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choices(characters, k=length))
+# Notification topics never change for a given trunk list, so build them once
+trunk_topics = [f"v2.telephony.providers.edges.trunks.{trunk_id}.metrics" for trunk_id in trunk_ids]
+# Subscription frame with the topics serialized up front; only the correlation ID varies per connect
+SUBSCRIBE_PREFIX = '{"message":"subscribe","topics":' + orjson.dumps(trunk_topics).decode() + ',"correlationId":"'
+SUBSCRIBE_SUFFIX = '"}'
 
-# Authenticate
+# Generate random correlation ID (12 URL-safe characters from 9 random bytes)
+def generate_correlation_id():
+    return secrets.token_urlsafe(9)
+
+# Authenticate, reusing the shared client (and its warm connection pool) and only refreshing the token
 def authenticate():
+    global api_client
     try:
-        api_client = PureCloudPlatformClientV2.api_client.ApiClient()
-        api_client.host = ENVIRONMENT
-        auth_token = api_client.get_client_credentials_token(CLIENT_ID, CLIENT_SECRET)
+        if api_client is None:
+            # Only publish the client once it is fully configured
+            client = PureCloudPlatformClientV2.api_client.ApiClient()
+            client.host = ENVIRONMENT
+            # Size the pool to fetch_trunk_names' concurrency so parallel GETs keep their connections
+            client.rest_client.pool_manager.connection_pool_kw["maxsize"] = FETCH_WORKERS
+            api_client = client
+        api_client.get_client_credentials_token(CLIENT_ID, CLIENT_SECRET)
         logger.info("Authentication successful")
-        return api_client, auth_token
+        return api_client
     except Exception as e:
-        logger.error(f"Authentication failed: {e}")
+        logger.error("Authentication failed: %s", e)
         raise
 
-# Fetch trunkbase names and pre-populate call_counts
-def fetch_trunk_names(api_client):
+# Fetch trunkbase names and pre-populate call_counts; returns True if every trunk was fetched
+def fetch_trunk_names():
+    with trunk_fetch_lock:
+        return fetch_trunk_names_locked()
+
+def fetch_trunk_names_locked():
     try:
         telephony_api = TelephonyProvidersEdgeApi(api_client)
-        for trunk_id in trunk_ids:
-            trunk = telephony_api.get_telephony_providers_edges_trunk(trunk_id)
-            trunkbase_name = trunk.trunk_base.name
-            trunk_id_to_base_map[trunk_id] = trunkbase_name
-            logger.info(f"Fetched trunkbase name: {trunkbase_name} for ID: {trunk_id}")
-        
-        # Pre-populate call_counts with unique trunkbase names
-        unique_trunkbase_names = set(trunk_id_to_base_map.values())
-        for trunkbase_name in unique_trunkbase_names:
-            call_counts[trunkbase_name]  # Trigger defaultdict to initialize with 0s
-            logger.info(f"Pre-populated call_counts for trunkbase: {trunkbase_name}")
+        # The GETs are latency-bound, so issue them concurrently and populate the map after they all return
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            futures = {trunk_id: executor.submit(telephony_api.get_telephony_providers_edges_trunk, trunk_id)
+                       for trunk_id in trunk_ids}
+        trunk_map = {}
+        failed = 0
+        for trunk_id, future in futures.items():
+            try:
+                trunkbase_name = future.result().trunk_base.name
+            except Exception as e:
+                # One bad trunk (e.g. deleted) must not hide the rest; keep any trunkbase already known for it
+                logger.error("Failed to fetch trunkbase name for ID %s: %s", trunk_id, e)
+                failed += 1
+                if trunk_id in trunk_id_to_base_map:
+                    trunk_map[trunk_id] = trunk_id_to_base_map[trunk_id]
+                continue
+            trunk_map[trunk_id] = trunkbase_name
+            logger.info("Fetched trunkbase name: %s for ID: %s", trunkbase_name, trunk_id)
+
+        apply_trunk_map(trunk_map)
+        # Only a complete map is worth caching; a partial one is refetched on the next load
+        if not failed:
+            save_trunk_map_cache(trunk_map)
+        return not failed
     except Exception as e:
-        logger.error(f"Failed to fetch trunkbase names: {e}")
+        logger.error("Failed to fetch trunkbase names: %s", e)
+        return False
+
+# Install a trunk ID -> trunkbase name mapping (replacing the previous one) and pre-populate call_counts from it
+def apply_trunk_map(trunk_map):
+    global layout_version, counts_sequence
+    with counts_lock:
+        trunk_id_to_base_map.clear()
+        trunk_id_to_base_map.update(trunk_map)
+
+        # Build the reverse index once so aggregation never scans every trunk
+        base_to_trunk_ids.clear()
+        for trunk_id, trunkbase_name in trunk_id_to_base_map.items():
+            base_to_trunk_ids[trunkbase_name].append(trunk_id)
+
+        # Pre-populate call_counts with unique trunkbase names, seeded from the latest per-trunk counts
+        for trunkbase_name, ids in base_to_trunk_ids.items():
+            totals = call_counts.setdefault(trunkbase_name, {"inbound": 0, "outbound": 0})
+            totals["inbound"] = sum(inbound_counts[trunk_index[i]] for i in ids)
+            totals["outbound"] = sum(outbound_counts[trunk_index[i]] for i in ids)
+            logger.info("Pre-populated call_counts for trunkbase: %s", trunkbase_name)
+        # Drop trunkbases that no longer have any trunks so their last totals don't linger
+        for trunkbase_name in list(call_counts):
+            if trunkbase_name not in base_to_trunk_ids:
+                del call_counts[trunkbase_name]
+        layout_version += 1
+        counts_sequence += 1
+        counts_changed.notify_all()
+
+# Read the cached trunk mapping restricted to trunk_ids, or None if it is missing, stale or does not cover them
+def load_trunk_map_cache():
+    try:
+        if time.time() - os.path.getmtime(TRUNK_MAP_CACHE) >= TRUNK_MAP_MAX_AGE:
+            return None
+        with open(TRUNK_MAP_CACHE, "rb") as f:
+            trunk_map = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.debug("Trunk map cache unavailable: %s", e)
+        return None
+    if not isinstance(trunk_map, dict) or not all(trunk_id in trunk_map for trunk_id in trunk_ids):
+        return None
+    # Trunks removed from trunkID.py may still be in the file; they have no slot in the count arrays
+    return {trunk_id: trunk_map[trunk_id] for trunk_id in trunk_ids}
+
+def save_trunk_map_cache(trunk_map):
+    try:
+        tmp_path = TRUNK_MAP_CACHE + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(trunk_map))
+        os.replace(tmp_path, TRUNK_MAP_CACHE)
+    except OSError as e:
+        logger.warning("Failed to write trunk map cache: %s", e)
+
+# Revalidate the cached mapping from the API, unless a fetch is already running
+def refresh_trunk_names():
+    global trunk_map_refreshed
+    if not trunk_fetch_lock.acquire(blocking=False):
+        return
+    try:
+        if fetch_trunk_names_locked():
+            trunk_map_refreshed = True
+    finally:
+        trunk_fetch_lock.release()
+
+# Use the cached trunk mapping when fresh, otherwise fetch it now. A cache written by an earlier
+# process is revalidated in the background once; reconnects after that skip the REST calls.
+def load_trunk_names():
+    global trunk_map_refreshed
+    trunk_map = load_trunk_map_cache()
+    if trunk_map is None:
+        trunk_map_refreshed = fetch_trunk_names()
+        return
+    if trunk_map != trunk_id_to_base_map:
+        logger.info("Loaded %d trunkbase names from %s", len(trunk_map), TRUNK_MAP_CACHE)
+        apply_trunk_map(trunk_map)
+    if not trunk_map_refreshed:
+        threading.Thread(target=refresh_trunk_names, daemon=True).start()
 
 # Create notification channel
-def create_notification_channel(api_client):
+def create_notification_channel():
     try:
         notifications_api = NotificationsApi(api_client)
         channel = notifications_api.post_notifications_channels()
         logger.info("Notification channel created")
         return channel
     except Exception as e:
-        logger.error(f"Failed to create notification channel: {e}")
+        logger.error("Failed to create notification channel: %s", e)
         raise
 
 # WebSocket message handler
-def on_message(ws, message):
+def on_message(message):
+    global counts_sequence
+    logger.debug(message)
+    try:
+        data = orjson.loads(message)
+    except orjson.JSONDecodeError as e:
+        logger.error("Failed to decode message: %s", e)
+        return
+
+    # Trunk metric events have one fixed shape; anything else (heartbeats, subscription
+    # replies, trunks we are not tracking, other JSON shapes) is skipped via KeyError/TypeError
     try:
-        logger.debug(message)
-        data = json.loads(message)
-        event_body = data.get("eventBody", {})
-        trunk_id = event_body.get("trunk", {}).get("id")
-        calls = event_body.get("calls", {})
-        
-        if trunk_id and trunk_id in trunk_id_to_base_map:
-            trunkbase_name = trunk_id_to_base_map[trunk_id]
-            inbound_count = calls.get("inboundCallCount", 0)
-            outbound_count = calls.get("outboundCallCount", 0)
-            # Update latest counts for this trunk_id
-            trunk_counts[trunk_id]["inbound"] = inbound_count
-            trunk_counts[trunk_id]["outbound"] = outbound_count
-            logger.info(f"Updated trunk counts for trunk ID {trunk_id} (trunkbase {trunkbase_name}): Inbound={inbound_count}, Outbound={outbound_count}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to decode message: {e}")
-
-def on_error(ws, error):
-    logger.error(f"WebSocket Error: {error}")
-
-def on_close(ws, close_status_code, close_msg):
-    logger.warning(f"WebSocket Closed: {close_status_code} - {close_msg}")
-
-def on_open(ws):
+        event_body = data["eventBody"]
+        trunk_id = event_body["trunk"]["id"]
+        calls = event_body["calls"]
+        inbound_count = calls["inboundCallCount"]
+        outbound_count = calls["outboundCallCount"]
+        trunkbase_name = trunk_id_to_base_map[trunk_id]
+    except (KeyError, TypeError):
+        return
+    if type(inbound_count) is not int or type(outbound_count) is not int:
+        logger.warning("Ignoring non-integer call counts for trunk ID %s: %r, %r", trunk_id, inbound_count, outbound_count)
+        return
+
+    # Update latest counts for this trunk_id, then apply the change to the trunkbase running totals.
+    # The arrays are written first so a value they reject (out of int64 range) leaves the totals untouched.
+    i = trunk_index[trunk_id]
+    if inbound_counts[i] != inbound_count or outbound_counts[i] != outbound_count:
+        with counts_lock:
+            # A background refresh may have remapped or dropped this trunk since the lookup above
+            trunkbase_name = trunk_id_to_base_map.get(trunk_id)
+            if trunkbase_name is None:
+                return
+            previous_inbound = inbound_counts[i]
+            previous_outbound = outbound_counts[i]
+            try:
+                inbound_counts[i] = inbound_count
+                outbound_counts[i] = outbound_count
+            except OverflowError:
+                inbound_counts[i] = previous_inbound
+                logger.warning("Ignoring out-of-range call counts for trunk ID %s: %d, %d",
+                               trunk_id, inbound_count, outbound_count)
+                return
+            totals = call_counts[trunkbase_name]
+            totals["inbound"] += inbound_count - previous_inbound
+            totals["outbound"] += outbound_count - previous_outbound
+            counts_sequence += 1
+            counts_changed.notify_all()
+    # At most one log line per trunk per TRUNK_LOG_INTERVAL seconds
+    if logger.isEnabledFor(logging.INFO):
+        now = time.monotonic()
+        if now - trunk_last_logged.get(trunk_id, float("-inf")) >= TRUNK_LOG_INTERVAL:
+            trunk_last_logged[trunk_id] = now
+            logger.info("Updated trunk counts for trunk ID %s (trunkbase %s): Inbound=%d, Outbound=%d",
+                        trunk_id, trunkbase_name, inbound_count, outbound_count)
+
+async def on_open(ws):
     logger.info("WebSocket connection opened")
-    subscribe_to_trunk_metrics(ws)
+    await subscribe_to_trunk_metrics(ws)
+
+def on_close(ws):
+    logger.warning("WebSocket Closed: %s - %s", ws.close_code, ws.close_reason)
 
 # Subscribe to trunk metrics
-def subscribe_to_trunk_metrics(ws):
+async def subscribe_to_trunk_metrics(ws):
     correlation_id = generate_correlation_id()
-    for trunk_id in trunk_ids:
-        topic = f"v2.telephony.providers.edges.trunks.{trunk_id}.metrics"
-        subscription = {
-            "message": "subscribe",
-            "topics": [topic],
-            "correlationId": correlation_id
-        }
-        ws.send(json.dumps(subscription))
-        logger.info(f"Subscribed to trunk metrics for trunk ID: {trunk_id} (Correlation ID: {correlation_id})")
-
-# Keep WebSocket alive
-def keep_alive(ws):
-    while True:
-        time.sleep(30)
-        try:
-            ws.send(json.dumps({"message": "ping"}))
-            logger.debug("Sent keep-alive ping")
-        except Exception as e:
-            logger.error(f"Keep-alive failed: {e}")
-            break
+    # One frame for all trunks instead of one frame per trunk; correlation IDs are URL-safe so need no escaping
+    await ws.send(SUBSCRIBE_PREFIX + correlation_id + SUBSCRIBE_SUFFIX)
+    logger.info("Subscribed to trunk metrics for %d trunk IDs (Correlation ID: %s)", len(trunk_ids), correlation_id)
 
 # WebSocket runner with connection management
 def run_websocket():
-    api_client = None
+    asyncio.run(stream_trunk_metrics())
+
+async def stream_trunk_metrics():
+    authenticated = False
     channel = None
-    ws = None
-    
+    attempt = 0  # Reconnects since a message was last handled
+
     while True:
         try:
-            if api_client is None:
-                api_client, _ = authenticate()
-                fetch_trunk_names(api_client)  # Fetch trunkbase names and pre-populate after authentication
-            
+            if not authenticated:
+                authenticate()
+                authenticated = True
+                load_trunk_names()  # Load trunkbase names and pre-populate after authentication
+
             if channel is None:
-                channel = create_notification_channel(api_client)
+                channel = create_notification_channel()
                 ws_uri = channel.connect_uri
-                logger.info(f"WebSocket URI: {ws_uri}")
-                
-                ws = websocket.WebSocketApp(
-                    ws_uri,
-                    on_open=on_open,
-                    on_message=on_message,
-                    on_error=on_error,
-                    on_close=on_close
-                )
-                
-                ws.run_forever()
-                
-                # Note: No separate threading as per your update; keep_alive is not used here
+                logger.info("WebSocket URI: %s", ws_uri)
+
+            # The library answers and sends protocol pings itself; compression is off since
+            # metric frames are tiny and permessage-deflate costs memory per connection
+            async with websocket_connect(ws_uri, ping_interval=PING_INTERVAL, ping_timeout=PING_TIMEOUT,
+                                         compression=None) as ws:
+                await on_open(ws)
+                # Hand the raw frame bytes to orjson instead of decoding them to str first
+                try:
+                    while True:
+                        on_message(await ws.recv(decode=False))
+                        attempt = 0  # A message was handled, so the connection is healthy again
+                except websockets.ConnectionClosedOK:
+                    pass
+            on_close(ws)
+            error = None
 
         except Exception as e:
-            logger.error(f"WebSocket error: {e}. Reconnecting in 5 seconds...")
-            api_client = None
+            error = e
+            authenticated = False
             channel = None
-            time.sleep(5)
+
+        # Exponential backoff with jitter, for clean closes as well as errors, so many dashboards
+        # don't reconnect in lockstep after an outage. The exponent is capped well past the point
+        # where RECONNECT_MAX_DELAY takes over, so 1.5 ** attempt can never overflow.
+        delay = min(RECONNECT_MAX_DELAY, 1.5 ** attempt) + random.uniform(0, 1)
+        attempt = min(attempt + 1, RECONNECT_MAX_ATTEMPT)
+        if error is None:
+            logger.warning("Reconnecting in %.1f seconds...", delay)
+        else:
+            logger.error("WebSocket error: %s. Reconnecting in %.1f seconds...", error, delay)
+        await asyncio.sleep(delay)
 
 # Dash dashboard setup
 app = Dash(__name__)
+server = app.server  # WSGI entry point for gunicorn (see gunicorn.conf.py)
 
-def generate_trunk_counters():
+# Only rebuild the component tree when the set of trunkbase names has changed;
+# the counts themselves are filled in by the browser from /stream
+@lru_cache(maxsize=1)
+def generate_trunk_counters(version):
     counters = []
-    # Compute sums for each trunkbase_name based on trunk_counts
-    for trunkbase_name in call_counts.keys():  # Use pre-populated keys to ensure all trunks are shown
-        total_inbound = 0
-        total_outbound = 0
-        # Sum counts for all trunk_ids mapped to this trunkbase_name
-        for trunk_id, base_name in trunk_id_to_base_map.items():
-            if base_name == trunkbase_name:
-                total_inbound += trunk_counts[trunk_id]["inbound"]
-                total_outbound += trunk_counts[trunk_id]["outbound"]
-        
+    for trunkbase_name in list(call_counts.keys()):  # Use pre-populated keys to ensure all trunks are shown
         counters.append(
             html.Div([
                 html.H3(f"Trunk: {trunkbase_name}", style={
@@ -193,8 +357,10 @@ def generate_trunk_counters():
                     "whiteSpace": "nowrap"  # Keep this to prevent wrapping
                     # Removed "overflow": "hidden" and "textOverflow": "ellipsis"
                 }),
-                html.Div(f"Inbound Calls: {total_inbound}", style={"color": "blue", "marginLeft": "20px"}),
-                html.Div(f"Outbound Calls: {total_outbound}", style={"color": "green", "marginLeft": "20px"})
+                html.Div(["Inbound Calls: ", html.Span(id={"type": "inbound-calls", "base": trunkbase_name})],
+                         style={"color": "blue", "marginLeft": "20px"}),
+                html.Div(["Outbound Calls: ", html.Span(id={"type": "outbound-calls", "base": trunkbase_name})],
+                         style={"color": "green", "marginLeft": "20px"})
             ], className="tile")
         )
     return counters
@@ -202,7 +368,9 @@ def generate_trunk_counters():
 app.layout = html.Div([
     html.H1("Trunk Metrics Dashboard", style={"textAlign": "center", "marginBottom": "20px"}),
     html.Div(id="trunk-counters", className="grid-container"),
-    dcc.Interval(id="interval-component", interval=5*1000, n_intervals=0)  # Update every 5 seconds
+    dcc.Store(id="counts-store"),  # Latest payload pushed to this browser over /stream
+    dcc.Store(id="layout-request"),  # Layout version seen in a payload that differs from the rendered one
+    dcc.Store(id="layout-version")  # Tile layout version last sent to this browser
 ])
 
 # Add CSS styles
@@ -216,17 +384,144 @@ app.css.append_css({
     'external_url': '/assets/styles.css'
 })
 
+# Current trunkbase totals as JSON, plus the layout version so browsers know when to re-render tiles
+def counts_snapshot():
+    with counts_lock:
+        return counts_sequence, orjson.dumps({"version": layout_version, "counts": call_counts})
+
+@server.route("/counts")
+def serve_counts():
+    _, payload = counts_snapshot()
+    return Response(payload, mimetype="application/json")
+
+# Push a snapshot whenever the counts change, coalescing bursts into one event. Each open stream
+# holds a server thread, so only STREAM_LIMIT are allowed; the rest get a 503, poll /counts and retry later
+@server.route("/stream")
+def stream_counts():
+    if not stream_slots.acquire(blocking=False):
+        return Response("Too many open streams", status=503, headers={"Retry-After": str(STREAM_RETRY_AFTER)})
+
+    def events():
+        seen = None
+        while True:
+            with counts_changed:
+                changed = counts_changed.wait_for(lambda: counts_sequence != seen, timeout=STREAM_KEEPALIVE)
+            if not changed:
+                yield b": keep-alive\n\n"
+                continue
+            time.sleep(STREAM_COALESCE)
+            seen, payload = counts_snapshot()
+            yield b"data: " + payload + b"\n\n"
+
+    response = Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+    response.call_on_close(stream_slots.release)
+    return response
+
+# Open the event stream once per page load and feed each event into the store. If the server
+# refuses the stream, poll /counts every 5 seconds and retry the stream after STREAM_RETRY_AFTER
+app.clientside_callback(
+    """
+    function(id) {
+        var poll = null;
+        function update(payload) {
+            window.dash_clientside.set_props("counts-store", {data: payload});
+        }
+        function connect() {
+            var source = new EventSource("/stream");
+            source.onopen = function() {
+                if (poll !== null) {
+                    clearInterval(poll);
+                    poll = null;
+                }
+            };
+            source.onmessage = function(event) {
+                update(JSON.parse(event.data));
+            };
+            source.onerror = function() {
+                // EventSource does not reconnect after a 503 and cannot read Retry-After, so retry by hand
+                if (source.readyState === EventSource.CLOSED) {
+                    if (poll === null) {
+                        poll = setInterval(function() {
+                            fetch("/counts")
+                                .then(function(response) { return response.json(); })
+                                .then(update)
+                                .catch(function() {});
+                        }, 5000);
+                    }
+                    setTimeout(connect, """ + str(STREAM_RETRY_AFTER * 1000) + """);
+                }
+            };
+        }
+        connect();
+        return window.dash_clientside.no_update;
+    }
+    """,
+    Output("counts-store", "data"),
+    Input("counts-store", "id")
+)
+
+# Write counts into the tiles, touching only the nodes whose value changed
+app.clientside_callback(
+    """
+    function(payload, tiles, inbound, outbound) {
+        var noUpdate = window.dash_clientside.no_update;
+        var outputs = window.dash_clientside.callback_context.outputs_list;
+        var counts = (payload && payload.counts) || {};
+        function update(outputList, current, key) {
+            return outputList.map(function(output, i) {
+                var totals = counts[output.id.base];
+                var value = totals ? String(totals[key]) : current[i];
+                return value === current[i] ? noUpdate : value;
+            });
+        }
+        return [update(outputs[0], inbound, "inbound"), update(outputs[1], outbound, "outbound")];
+    }
+    """,
+    Output({"type": "inbound-calls", "base": ALL}, "children"),
+    Output({"type": "outbound-calls", "base": ALL}, "children"),
+    Input("counts-store", "data"),
+    Input("trunk-counters", "children"),
+    State({"type": "inbound-calls", "base": ALL}, "children"),
+    State({"type": "outbound-calls", "base": ALL}, "children")
+)
+
+# Only ask the server for new tiles when a payload carries a layout version this browser hasn't rendered
+app.clientside_callback(
+    """
+    function(payload, rendered) {
+        if (!payload || payload.version === rendered) {
+            return window.dash_clientside.no_update;
+        }
+        return payload.version;
+    }
+    """,
+    Output("layout-request", "data"),
+    Input("counts-store", "data"),
+    State("layout-version", "data")
+)
+
 @app.callback(
     Output("trunk-counters", "children"),
-    Input("interval-component", "n_intervals")
+    Output("layout-version", "data"),
+    Input("layout-request", "data"),
+    State("layout-version", "data")
 )
-def update_dashboard(n):
-    return generate_trunk_counters()
+def update_dashboard(requested_version, last_version):
+    # Tiles only need rebuilding when trunkbase names were (re)loaded since this browser's last render
+    version = layout_version
+    if version == last_version:
+        raise PreventUpdate
+    return generate_trunk_counters(version), version
 
-# Main execution
-if __name__ == "__main__":
+# Start the notification stream alongside the dashboard
+def start_websocket_thread():
     websocket_thread = threading.Thread(target=run_websocket)
     websocket_thread.daemon = True
     websocket_thread.start()
+    return websocket_thread
+
+# Main execution (development server; use gunicorn in production)
+if __name__ == "__main__":
+    start_websocket_thread()
 
     app.run_server(debug=False, host="0.0.0.0", port=8050)